@@ -6,28 +6,249 @@ Connects to the SQLite database created by Goobert and displays
 comprehensive statistics with modern visualizations.
 """
 
+import functools
+import hashlib
+import queue
 import sqlite3
 import os
-import subprocess
-from datetime import datetime, timedelta
+import shutil
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
 app = Flask(__name__)
 CORS(app)
 
+if Compress is not None:
+    # The JSON payloads are highly repetitive (repeated keys and directory
+    # prefixes); deflate typically gets 5-10x on them in one C call.
+    app.config['COMPRESS_MIMETYPES'] = ['application/json']
+    app.config['COMPRESS_LEVEL'] = 4
+    Compress(app)
+
+if orjson is not None:
+    from flask.json.provider import DefaultJSONProvider
+
+    class ORJSONProvider(DefaultJSONProvider):
+        """Serialize responses with orjson (~3x faster than stdlib json)"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+
 # Database path
 DB_PATH = os.path.expanduser("~/.config/goobert/goobert.db")
 
+# Resolved once; spawning via the absolute path skips the PATH walk and
+# lets posix_spawn avoid forking the interpreter.
+MPV_PATH = shutil.which("mpv")
+
+# pids from /api/open-mpv: posix_spawn has no Popen object wait()ing on
+# them, so exited players are reaped on the next launch.
+_mpv_pids = []
+_mpv_lock = threading.Lock()
+
+# Small pool of long-lived connections: opening sqlite per request costs
+# three openat() calls (db, -wal, -shm) plus statement-cache warmup loss.
+POOL_SIZE = 4
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+
+# WAL mode and synchronous level persist in the database file, so they only
+# need to be applied once per process, not on every connection.
+_db_tuned = False
+_indexes_ensured = False
+
+
+def _ensure_indexes(conn):
+    """Create covering indexes for the grouped aggregations, once per process.
+
+    The main app creates single-column indexes on started_at/hour_of_day;
+    the composites here let the GROUP BY hour/day SUM(duration_ms) queries
+    run as index-only scans.
+    """
+    global _indexes_ensured
+    if _indexes_ensured:
+        return
+    cur = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='watch_sessions'")
+    if not cur.fetchone():
+        # Fresh database - the main app hasn't created the schema yet.
+        return
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ws_hour_dur"
+                 " ON watch_sessions(hour_of_day, duration_ms)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ws_dow_dur"
+                 " ON watch_sessions(day_of_week, duration_ms)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ws_started_dur"
+                 " ON watch_sessions(started_at, duration_ms)")
+    # The main app indexes skip/fullscreen timestamps but not loop_events;
+    # the merged /api/events query wants all three index-ordered.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_loop_events_timestamp"
+                 " ON loop_events(timestamp DESC)")
+    # Partial variant of the main app's total_watch index: top-files and
+    # directory queries all filter on total_watch_ms > 0, so the scan can
+    # skip never-played files entirely.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fs_watch_pos"
+                 " ON file_stats(total_watch_ms DESC) WHERE total_watch_ms > 0")
+    # Created here rather than on every toggle-favorite POST; older main-app
+    # databases predate the favorites table.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS favorites (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_id INTEGER UNIQUE NOT NULL,
+            added_at INTEGER DEFAULT (strftime('%s', 'now') * 1000),
+            FOREIGN KEY (file_id) REFERENCES file_stats(id)
+        )
+    """)
+    # Refresh planner statistics so the new indexes actually get picked.
+    conn.execute("ANALYZE")
+    conn.commit()
+    _indexes_ensured = True
 
-def get_db():
-    """Get database connection"""
-    conn = sqlite3.connect(DB_PATH)
+
+def _connect():
+    """Open and tune a new database connection"""
+    global _db_tuned
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False,
+                           cached_statements=256)
     conn.row_factory = sqlite3.Row
+    if not _db_tuned:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _db_tuned = True
+    # Per-connection tuning: bigger page cache, in-memory temp tables and
+    # mmap'd reads keep the aggregate-heavy endpoints off the syscall path.
+    conn.execute("PRAGMA cache_size=-64000")  # 64 MB
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    # Lets GROUP BY run on the directory inside sqlite instead of hauling
+    # every file row across the wrapper boundary.
+    conn.create_function("dirname", 1, os.path.dirname, deterministic=True)
+    _ensure_indexes(conn)
     return conn
 
 
+@contextmanager
+def get_db():
+    """Borrow a pooled database connection for the duration of a request"""
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = _connect()
+    try:
+        yield conn
+    finally:
+        # A handler that failed mid-write leaves an open implicit transaction
+        # on the connection; roll it back (a no-op when clean) so a pooled
+        # connection never sits on a write lock blocking the main app.
+        conn.rollback()
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def ttl_cache(seconds=10):
+    """Serve repeat hits of an endpoint from memory for a few seconds.
+
+    The dashboard polls at a few Hz while the database only changes at
+    watcher rate, so a short TTL takes steady-state DB load to near zero.
+    Entries are keyed per query string and hold body/status/headers rather
+    than a Response: after_request hooks (flask-compress) mutate responses
+    in place, so handing out a cached object would serve one client's
+    gzip bytes to everyone for the rest of the TTL.
+    """
+    def decorator(fn):
+        cache = {}
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = request.query_string
+            now = time.monotonic()
+            hit = cache.get(key)
+            if hit is None or now - hit[0] >= seconds:
+                resp = fn(*args, **kwargs)
+                # ETag over the body so repeat loads within the browser's
+                # cache turn into 304s with no payload at all.
+                etag = hashlib.blake2b(
+                    resp.get_data(), digest_size=16).hexdigest()
+                hit = (now, resp.get_data(), resp.status_code,
+                       list(resp.headers), etag)
+                cache[key] = hit
+            _, body, status, headers, etag = hit
+            if request.if_none_match.contains(etag):
+                return app.response_class(status=304)
+            resp = app.response_class(body, status=status, headers=headers)
+            resp.set_etag(etag)
+            return resp
+        return wrapper
+    return decorator
+
+
+
+_MS_PER_DAY = 86_400_000
+
+# Label tables built once at import; day_of_week is 1-based (Mon=1).
+DAY_NAMES = ('', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+DOW_LABELS = DAY_NAMES[1:]
+HOUR_LABELS = tuple(f"{h:02d}:00" for h in range(24))
+PCT10_LABELS = tuple(f"{i}%" for i in range(0, 110, 10))
+PCT5_LABELS = tuple(f"{i}%" for i in range(0, 105, 5))
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def _today_start_ms():
+    """Epoch ms of local midnight, via integer math on struct_time"""
+    now = time.time()
+    lt = time.localtime(now)
+    return (int(now) - lt.tm_hour * 3600 - lt.tm_min * 60 - lt.tm_sec) * 1000
+
+
+def sql_duration(col):
+    """SQL fragment mirroring format_duration, for per-row formatting.
+
+    Row-heavy endpoints format durations inside the VDBE instead of
+    calling format_duration once per row; the scalar summary fields keep
+    the Python version.
+    """
+    ms = f"COALESCE({col}, 0)"
+    return (f"CASE WHEN {ms} / 1000 < 60 THEN ({ms} / 1000) || 's'"
+            f" WHEN {ms} / 1000 < 3600 THEN ({ms} / 60000) || 'm ' || (({ms} / 1000) % 60) || 's'"
+            f" ELSE ({ms} / 3600000) || 'h ' || (({ms} / 60000) % 60) || 'm' END")
+
+
+
+@functools.lru_cache(maxsize=4096)
+def _basename(path):
+    """Cached os.path.basename - media paths repeat heavily across rows"""
+    return os.path.basename(path)
+
+
+@functools.lru_cache(maxsize=4096)
+def _dirname(path):
+    """Cached os.path.dirname, same rationale as _basename"""
+    return os.path.dirname(path)
+
+
 def format_duration(ms):
     """Format milliseconds to human readable string"""
     if ms is None:
@@ -43,6 +264,380 @@ def format_duration(ms):
         return f"{hours}h {mins}m"
 
 
+# Each /api/events branch is pre-bounded by an inner LIMIT so the outer
+# merge-sort only sees up to 3*limit index-ordered rows.
+_EVENT_BRANCHES = {
+    'skip': """
+        SELECT * FROM (
+            SELECT 'skip' as type, file_path, timestamp, skip_type as detail
+            FROM skip_events
+            ORDER BY timestamp DESC
+            LIMIT :limit
+        )""",
+    'loop': """
+        SELECT * FROM (
+            SELECT 'loop' as type, file_path, timestamp,
+                   CASE WHEN loop_enabled THEN 'enabled' ELSE 'disabled' END as detail
+            FROM loop_events
+            ORDER BY timestamp DESC
+            LIMIT :limit
+        )""",
+    'fullscreen': """
+        SELECT * FROM (
+            SELECT 'fullscreen' as type, NULL as file_path, timestamp,
+                   CASE WHEN is_fullscreen THEN 'enter' ELSE 'exit' END
+                   || CASE WHEN is_tile
+                           THEN ' tile [' || cell_row || ',' || cell_col || ']'
+                           ELSE '' END as detail
+            FROM fullscreen_events
+            ORDER BY timestamp DESC
+            LIMIT :limit
+        )""",
+}
+
+
+def _event_sql(branches):
+    return ("SELECT type, file_path, timestamp, detail,"
+            " strftime('%Y-%m-%d %H:%M:%S', timestamp / 1000, 'unixepoch', 'localtime') as time_fmt"
+            " FROM (" + " UNION ALL ".join(branches) + ")"
+            " ORDER BY timestamp DESC LIMIT :limit")
+
+
+_EVENT_SQL = {etype: _event_sql((branch,))
+              for etype, branch in _EVENT_BRANCHES.items()}
+_EVENT_SQL['all'] = _event_sql(_EVENT_BRANCHES.values())
+
+
+# SQL statement text lives at module level: execute() then hits
+# sqlite's statement cache by string identity instead of re-hashing
+# freshly built query strings on every request.
+_Q_SUMMARY = """
+            SELECT
+                (SELECT COALESCE(SUM(total_watch_ms), 0) FROM file_stats) AS acc_ms,
+                (SELECT MIN(started_at) FROM watch_sessions WHERE started_at > 0) AS first_start,
+                (SELECT MAX(ended_at) FROM watch_sessions WHERE started_at > 0) AS last_end,
+                (SELECT MIN(started_at) FROM watch_sessions WHERE started_at >= :today) AS today_first,
+                (SELECT MAX(ended_at) FROM watch_sessions WHERE started_at >= :today) AS today_last,
+                (SELECT COALESCE(SUM(duration_ms), 0) FROM watch_sessions WHERE started_at >= :today) AS today_acc_ms,
+                (SELECT COUNT(*) FROM watch_sessions WHERE started_at >= :today) AS today_sessions,
+                (SELECT COUNT(*) FROM file_stats WHERE total_watch_ms > 0) AS files_tracked,
+                (SELECT COUNT(*) FROM watch_sessions) AS total_sessions,
+                (SELECT AVG(duration_ms) FROM watch_sessions WHERE duration_ms > 0) AS avg_session,
+                (SELECT hour_of_day FROM watch_sessions
+                 GROUP BY hour_of_day ORDER BY SUM(duration_ms) DESC LIMIT 1) AS peak_hour,
+                (SELECT day_of_week FROM watch_sessions
+                 GROUP BY day_of_week ORDER BY SUM(duration_ms) DESC LIMIT 1) AS peak_day,
+                (SELECT COUNT(*) FROM skip_events) AS total_skips,
+                (SELECT COUNT(*) FROM screenshot_events) AS total_screenshots
+        """
+
+_Q_HOURLY = """
+            SELECT hour_of_day, SUM(duration_ms) as total, COUNT(*) as sessions
+            FROM watch_sessions
+            GROUP BY hour_of_day
+            ORDER BY hour_of_day
+        """
+
+_Q_DAILY = """
+            SELECT day_of_week, SUM(duration_ms) as total, COUNT(*) as sessions
+            FROM watch_sessions
+            GROUP BY day_of_week
+            ORDER BY day_of_week
+        """
+
+_Q_TIMELINE = """
+            SELECT day, total_ms, sessions, first_session, last_session
+            FROM daily_rollup
+            WHERE day >= date(? / 1000, 'unixepoch', 'localtime')
+            ORDER BY day
+        """
+
+_Q_ROLLUP_DDL = """
+            CREATE TABLE IF NOT EXISTS daily_rollup (
+                day TEXT PRIMARY KEY,
+                total_ms INTEGER NOT NULL,
+                sessions INTEGER NOT NULL,
+                first_session INTEGER,
+                last_session INTEGER
+            )
+        """
+
+# Recomputes whole days at or past the watermark's day; the bind is a
+# local-midnight floor so every regrouped day sees all of its sessions.
+_Q_ROLLUP_REFRESH = """
+            INSERT OR REPLACE INTO daily_rollup
+            SELECT
+                date(started_at / 1000, 'unixepoch', 'localtime') as day,
+                SUM(duration_ms),
+                COUNT(*),
+                MIN(started_at),
+                MAX(ended_at)
+            FROM watch_sessions
+            WHERE started_at >= ?
+            GROUP BY day
+        """
+
+_Q_TOP_FILES = f"""
+            SELECT
+                fs.file_path,
+                fs.total_watch_ms,
+                {sql_duration('fs.total_watch_ms')} as watch_fmt,
+                fs.play_count,
+                CASE WHEN fs.last_watched_at
+                     THEN strftime('%Y-%m-%d %H:%M', fs.last_watched_at / 1000, 'unixepoch', 'localtime')
+                     ELSE 'Never' END as last_watched_fmt,
+                {sql_duration('fs.duration_ms')} as duration_fmt,
+                fs.is_image,
+                CASE WHEN fs.duration_ms > 0
+                     THEN ROUND(COALESCE(fs.last_position_ms, 0) * 100.0 / fs.duration_ms)
+                     ELSE 0 END as avg_pct,
+                (SELECT COUNT(*) FROM skip_events WHERE file_id = fs.id) as skip_count,
+                (SELECT COUNT(*) FROM loop_events WHERE file_id = fs.id) as loop_count
+            FROM (
+                SELECT * FROM file_stats
+                WHERE total_watch_ms > 0
+                ORDER BY total_watch_ms DESC
+                LIMIT ?
+            ) fs
+            ORDER BY fs.total_watch_ms DESC
+        """
+
+_Q_RECENT_SESSIONS = f"""
+            SELECT
+                fs.file_path,
+                CASE WHEN ws.started_at
+                     THEN strftime('%Y-%m-%d %H:%M:%S', ws.started_at / 1000, 'unixepoch', 'localtime')
+                     ELSE 'N/A' END as started_fmt,
+                CASE WHEN ws.ended_at
+                     THEN strftime('%H:%M:%S', ws.ended_at / 1000, 'unixepoch', 'localtime')
+                     ELSE 'N/A' END as ended_fmt,
+                {sql_duration('ws.duration_ms')} as duration_fmt,
+                ws.cell_row,
+                ws.cell_col,
+                ws.hour_of_day
+            FROM watch_sessions ws
+            JOIN file_stats fs ON ws.file_id = fs.id
+            ORDER BY ws.started_at DESC
+            LIMIT ?
+        """
+
+_Q_DIRECTORIES = """
+            SELECT
+                dirname(file_path) as dir_path,
+                SUM(total_watch_ms) as watch_ms,
+                SUM(play_count) as play_count,
+                COUNT(*) as file_count
+            FROM file_stats
+            WHERE total_watch_ms > 0
+            GROUP BY dir_path
+            ORDER BY watch_ms DESC
+            LIMIT 20
+        """
+
+_Q_GRID_SESSIONS = """
+            SELECT strftime('%Y-%m-%d %H:%M:%S', timestamp / 1000, 'unixepoch', 'localtime') as time_fmt,
+                   rows, cols, source_path, filter, is_start
+            FROM grid_events
+            ORDER BY timestamp DESC
+            LIMIT 50
+        """
+
+_Q_SKIP_HEATMAP = """
+            SELECT
+                CAST(se.from_position_ms * 100.0 / fs.duration_ms AS INTEGER) / 10 * 10 as bucket,
+                COUNT(*) as cnt
+            FROM skip_events se
+            JOIN file_stats fs ON se.file_id = fs.id
+            WHERE fs.duration_ms > 0
+            GROUP BY bucket
+            ORDER BY bucket
+        """
+
+_Q_POSITION_HEATMAP = """
+            SELECT position_pct, COUNT(*) as cnt
+            FROM position_samples
+            GROUP BY position_pct
+            ORDER BY position_pct
+        """
+
+_Q_SESSION_DIST = """
+            SELECT CASE
+                       WHEN duration_ms < 30000 THEN '<30s'
+                       WHEN duration_ms < 60000 THEN '30s-1m'
+                       WHEN duration_ms < 120000 THEN '1-2m'
+                       WHEN duration_ms < 300000 THEN '2-5m'
+                       WHEN duration_ms < 600000 THEN '5-10m'
+                       WHEN duration_ms < 1800000 THEN '10-30m'
+                       WHEN duration_ms < 3600000 THEN '30m-1h'
+                       ELSE '>1h'
+                   END as bucket, COUNT(*) as n
+            FROM watch_sessions
+            WHERE duration_ms > 0
+            GROUP BY bucket
+        """
+
+_Q_FILE_TYPES = """
+            SELECT is_image, SUM(total_watch_ms) as total, COUNT(*) as count
+            FROM file_stats
+            GROUP BY is_image
+        """
+
+_Q_SKIP_TYPES = """
+            SELECT skip_type, COUNT(*) as cnt
+            FROM skip_events
+            GROUP BY skip_type
+            ORDER BY cnt DESC
+        """
+
+_Q_CONCURRENT_SPAN = """
+            SELECT
+                COALESCE(SUM(duration_ms), 0) as total,
+                (MAX(ended_at) - MIN(started_at)) as elapsed
+            FROM watch_sessions
+            WHERE started_at > 0
+        """
+
+_Q_CELL_USAGE = f"""
+            SELECT cell_row, cell_col, COUNT(*) as sessions,
+                   {sql_duration('SUM(duration_ms)')} as watch_fmt
+            FROM watch_sessions
+            GROUP BY cell_row, cell_col
+            ORDER BY SUM(duration_ms) DESC
+        """
+
+# Weekly/monthly trends re-group the daily rollup (O(days) rows) rather
+# than re-aggregating watch_sessions (O(sessions) rows).
+_Q_WEEKLY_TREND = """
+            SELECT
+                strftime('%Y-W%W', day) as week,
+                SUM(total_ms) as total
+            FROM daily_rollup
+            WHERE day >= date(? / 1000, 'unixepoch', 'localtime')
+            GROUP BY week
+            ORDER BY week
+        """
+
+_Q_MONTHLY_TREND = """
+            SELECT
+                substr(day, 1, 7) as month,
+                SUM(total_ms) as total
+            FROM daily_rollup
+            WHERE day >= date(? / 1000, 'unixepoch', 'localtime')
+            GROUP BY month
+            ORDER BY month
+        """
+
+_Q_DIR_ANALYSIS = """
+            SELECT f.dir_path, f.watch_ms, f.play_count, f.file_count,
+                   COALESCE(s.sessions, 0) as session_count
+            FROM (
+                SELECT dirname(file_path) as dir_path,
+                       SUM(total_watch_ms) as watch_ms,
+                       SUM(play_count) as play_count,
+                       COUNT(*) as file_count
+                FROM file_stats
+                WHERE total_watch_ms > 0
+                GROUP BY dir_path
+            ) f
+            LEFT JOIN (
+                SELECT dirname(fs.file_path) as dir_path, COUNT(*) as sessions
+                FROM watch_sessions ws
+                JOIN file_stats fs ON ws.file_id = fs.id
+                GROUP BY dir_path
+            ) s ON s.dir_path = f.dir_path
+            ORDER BY f.watch_ms DESC
+            LIMIT 20
+        """
+
+_Q_FAVORITES = f"""
+            SELECT fs.file_path,
+                   {sql_duration('fs.total_watch_ms')} as watch_fmt,
+                   fs.play_count,
+                   CASE WHEN fs.last_watched_at
+                        THEN strftime('%Y-%m-%d %H:%M', fs.last_watched_at / 1000, 'unixepoch', 'localtime')
+                        ELSE 'Never' END as last_watched_fmt,
+                   fs.is_image,
+                   CASE WHEN f.added_at
+                        THEN strftime('%Y-%m-%d %H:%M', f.added_at / 1000, 'unixepoch', 'localtime')
+                        ELSE 'Unknown' END as added_fmt
+            FROM favorites f
+            JOIN file_stats fs ON f.file_id = fs.id
+            ORDER BY f.added_at DESC
+        """
+
+
+
+_ROLLUP_REFRESH_SECS = 60
+_rollup_lock = threading.Lock()
+_rollup_started = False
+_rollup_watermark = 0
+
+
+def _refresh_daily_rollup():
+    """Re-aggregate daily_rollup for days touched since the last refresh"""
+    global _rollup_watermark
+    with get_db() as conn:
+        cur = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='watch_sessions'")
+        if not cur.fetchone():
+            return
+        conn.execute(_Q_ROLLUP_DDL)
+        row = conn.execute(
+            "SELECT COALESCE(MAX(started_at), 0) FROM watch_sessions").fetchone()
+        max_started = row[0]
+        if max_started < _rollup_watermark:
+            # Sessions were deleted out from under us (Clear Stats in the
+            # main app); the incremental floor only ever re-inserts, so
+            # rebuild from scratch instead of serving vanished history.
+            floor_ms = 0
+        elif _rollup_watermark:
+            lt = time.localtime(_rollup_watermark / 1000)
+            day_start = (int(_rollup_watermark / 1000) - lt.tm_hour * 3600
+                         - lt.tm_min * 60 - lt.tm_sec) * 1000
+            # include the previous day as well so late-arriving sessions
+            # (and DST edges) re-aggregate cleanly
+            floor_ms = day_start - _MS_PER_DAY
+        else:
+            floor_ms = 0
+        # Days at or past the floor are fully regrouped below; delete them
+        # first because INSERT OR REPLACE can't remove a day whose sessions
+        # have all been deleted.
+        conn.execute(
+            "DELETE FROM daily_rollup"
+            " WHERE day >= date(? / 1000, 'unixepoch', 'localtime')",
+            (floor_ms,))
+        conn.execute(_Q_ROLLUP_REFRESH, (floor_ms,))
+        _rollup_watermark = max_started
+        conn.commit()
+
+
+def _rollup_loop():
+    while True:
+        time.sleep(_ROLLUP_REFRESH_SECS)
+        try:
+            _refresh_daily_rollup()
+        except sqlite3.Error:
+            pass
+
+
+def _start_rollup():
+    """Fill the rollup synchronously once, then refresh in the background.
+
+    Started lazily from the first timeline request so each gunicorn
+    worker gets its own thread (threads don't survive the --preload fork).
+    """
+    global _rollup_started
+    with _rollup_lock:
+        if _rollup_started:
+            return
+        # Latch only after the initial fill succeeds: if it raises (DB
+        # busy), the next request retries instead of freezing the rollup
+        # for the process lifetime.
+        _refresh_daily_rollup()
+        threading.Thread(target=_rollup_loop, daemon=True).start()
+        _rollup_started = True
+
+
 @app.route('/')
 def index():
     """Main dashboard page"""
@@ -50,99 +645,36 @@ def index():
 
 
 @app.route('/api/summary')
+@ttl_cache()
 def api_summary():
     """Get summary statistics"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    # Total accumulated watch time (what we were showing before)
-    cur.execute("SELECT COALESCE(SUM(total_watch_ms), 0) FROM file_stats")
-    accumulated_watch_ms = cur.fetchone()[0]
-
-    # Real elapsed time - based on actual session time spans
-    # This accounts for parallel playback correctly
-    cur.execute("""
-        SELECT
-            MIN(started_at) as first_start,
-            MAX(ended_at) as last_end
-        FROM watch_sessions
-        WHERE started_at > 0
-    """)
-    row = cur.fetchone()
-    if row and row['first_start'] and row['last_end']:
-        real_elapsed_ms = row['last_end'] - row['first_start']
-    else:
-        real_elapsed_ms = 0
-
-    # Today's real time (unique time ranges)
-    today_start = int(datetime.now().replace(hour=0, minute=0, second=0).timestamp() * 1000)
-    cur.execute("""
-        SELECT
-            MIN(started_at) as first_start,
-            MAX(ended_at) as last_end
-        FROM watch_sessions
-        WHERE started_at >= ?
-    """, (today_start,))
-    row = cur.fetchone()
-    today_real_ms = (row['last_end'] - row['first_start']) if row and row['first_start'] and row['last_end'] else 0
-
-    # Session-based stats for today
-    cur.execute("""
-        SELECT COALESCE(SUM(duration_ms), 0), COUNT(*)
-        FROM watch_sessions
-        WHERE started_at >= ?
-    """, (today_start,))
-    row = cur.fetchone()
-    today_accumulated_ms = row[0]
-    today_sessions = row[1]
-
-    # Files tracked
-    cur.execute("SELECT COUNT(*) FROM file_stats WHERE total_watch_ms > 0")
-    files_tracked = cur.fetchone()[0]
-
-    # Total sessions
-    cur.execute("SELECT COUNT(*) FROM watch_sessions")
-    total_sessions = cur.fetchone()[0]
-
-    # Average session length
-    cur.execute("SELECT AVG(duration_ms) FROM watch_sessions WHERE duration_ms > 0")
-    avg_session = cur.fetchone()[0] or 0
-
-    # Peak hour
-    cur.execute("""
-        SELECT hour_of_day, SUM(duration_ms) as total
-        FROM watch_sessions
-        GROUP BY hour_of_day
-        ORDER BY total DESC
-        LIMIT 1
-    """)
-    row = cur.fetchone()
-    peak_hour = row['hour_of_day'] if row else 0
-
-    # Peak day
-    cur.execute("""
-        SELECT day_of_week, SUM(duration_ms) as total
-        FROM watch_sessions
-        GROUP BY day_of_week
-        ORDER BY total DESC
-        LIMIT 1
-    """)
-    row = cur.fetchone()
-    peak_day = row['day_of_week'] if row else 1
-    days = ['', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-    peak_day_name = days[peak_day] if 1 <= peak_day <= 7 else 'N/A'
-
-    # Total skips and screenshots
-    cur.execute("SELECT COUNT(*) FROM skip_events")
-    total_skips = cur.fetchone()[0]
-
-    cur.execute("SELECT COUNT(*) FROM screenshot_events")
-    total_screenshots = cur.fetchone()[0]
-
-    # Parallelism factor (how much parallel playback on average)
-    parallelism = accumulated_watch_ms / real_elapsed_ms if real_elapsed_ms > 0 else 1
-
-    conn.close()
+    today_start = _today_start_ms()
+
+    with get_db() as conn:
+        cur = conn.cursor()
+
+        # One statement, one VDBE pass: every figure comes back as a scalar
+        # subquery so watch_sessions is scanned once per aggregate instead of
+        # dispatching ten separate queries through the sqlite3 wrapper.
+        cur.execute(_Q_SUMMARY, {'today': today_start})
+        row = cur.fetchone()
+
+        accumulated_watch_ms = row['acc_ms']
+        real_elapsed_ms = (row['last_end'] - row['first_start']) if row['first_start'] and row['last_end'] else 0
+        today_real_ms = (row['today_last'] - row['today_first']) if row['today_first'] and row['today_last'] else 0
+        today_accumulated_ms = row['today_acc_ms']
+        today_sessions = row['today_sessions']
+        files_tracked = row['files_tracked']
+        total_sessions = row['total_sessions']
+        avg_session = row['avg_session'] or 0
+        peak_hour = row['peak_hour'] if row['peak_hour'] is not None else 0
+        peak_day = row['peak_day'] if row['peak_day'] is not None else 1
+        peak_day_name = DAY_NAMES[peak_day] if 1 <= peak_day <= 7 else 'N/A'
+        total_skips = row['total_skips']
+        total_screenshots = row['total_screenshots']
+
+        # Parallelism factor (how much parallel playback on average)
+        parallelism = accumulated_watch_ms / real_elapsed_ms if real_elapsed_ms > 0 else 1
 
     return jsonify({
         'accumulated_watch_time': format_duration(accumulated_watch_ms),
@@ -164,369 +696,241 @@ def api_summary():
 
 
 @app.route('/api/hourly')
+@ttl_cache()
 def api_hourly():
     """Get hourly distribution"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT hour_of_day, SUM(duration_ms) as total, COUNT(*) as sessions
-        FROM watch_sessions
-        GROUP BY hour_of_day
-        ORDER BY hour_of_day
-    """)
-
-    # Initialize all 24 hours
-    hourly = {h: {'total_ms': 0, 'sessions': 0} for h in range(24)}
+    with get_db() as conn:
+        cur = conn.cursor()
 
-    for row in cur.fetchall():
-        hourly[row['hour_of_day']] = {
-            'total_ms': row['total'],
-            'sessions': row['sessions']
-        }
+        cur.execute(_Q_HOURLY)
 
-    conn.close()
+        # Fill the aligned 24-slot arrays directly; no per-hour dicts.
+        watch_time = [0.0] * 24
+        sessions = [0] * 24
+        for row in cur:
+            watch_time[row['hour_of_day']] = row['total'] / 1000 / 60  # minutes
+            sessions[row['hour_of_day']] = row['sessions']
 
     return jsonify({
-        'labels': [f"{h:02d}:00" for h in range(24)],
-        'watch_time': [hourly[h]['total_ms'] / 1000 / 60 for h in range(24)],  # minutes
-        'sessions': [hourly[h]['sessions'] for h in range(24)]
+        'labels': HOUR_LABELS,
+        'watch_time': watch_time,
+        'sessions': sessions
     })
 
 
 @app.route('/api/daily')
+@ttl_cache()
 def api_daily():
     """Get daily distribution (by day of week)"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT day_of_week, SUM(duration_ms) as total, COUNT(*) as sessions
-        FROM watch_sessions
-        GROUP BY day_of_week
-        ORDER BY day_of_week
-    """)
+    with get_db() as conn:
+        cur = conn.cursor()
 
-    days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-    daily = {d: {'total_ms': 0, 'sessions': 0} for d in range(1, 8)}
+        cur.execute(_Q_DAILY)
 
-    for row in cur.fetchall():
-        daily[row['day_of_week']] = {
-            'total_ms': row['total'],
-            'sessions': row['sessions']
-        }
-
-    conn.close()
+        # Aligned 7-slot arrays, day_of_week 1..7 mapped to index 0..6.
+        watch_time = [0.0] * 7
+        sessions = [0] * 7
+        for row in cur:
+            watch_time[row['day_of_week'] - 1] = row['total'] / 1000 / 60  # minutes
+            sessions[row['day_of_week'] - 1] = row['sessions']
 
     return jsonify({
-        'labels': days,
-        'watch_time': [daily[d]['total_ms'] / 1000 / 60 for d in range(1, 8)],  # minutes
-        'sessions': [daily[d]['sessions'] for d in range(1, 8)]
+        'labels': DOW_LABELS,
+        'watch_time': watch_time,
+        'sessions': sessions
     })
 
 
 @app.route('/api/timeline')
+@ttl_cache()
 def api_timeline():
     """Get timeline data - watch activity over time"""
-    conn = get_db()
-    cur = conn.cursor()
+    _start_rollup()
 
     # Last 30 days
     days = int(request.args.get('days', 30))
 
-    cur.execute("""
-        SELECT
-            date(started_at / 1000, 'unixepoch', 'localtime') as day,
-            SUM(duration_ms) as total_ms,
-            COUNT(*) as sessions,
-            MIN(started_at) as first_session,
-            MAX(ended_at) as last_session
-        FROM watch_sessions
-        WHERE started_at >= ?
-        GROUP BY day
-        ORDER BY day
-    """, (int((datetime.now() - timedelta(days=days)).timestamp() * 1000),))
-
-    data = []
-    for row in cur.fetchall():
-        real_time = (row['last_session'] - row['first_session']) if row['first_session'] and row['last_session'] else 0
-        data.append({
-            'date': row['day'],
-            'accumulated_minutes': row['total_ms'] / 1000 / 60,
-            'real_minutes': real_time / 1000 / 60,
-            'sessions': row['sessions']
-        })
-
-    conn.close()
-
-    return jsonify(data)
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute(_Q_TIMELINE, (_now_ms() - days * _MS_PER_DAY,))
+
+        rows = cur.fetchall()
+
+    return jsonify([{
+        'date': row['day'],
+        'accumulated_minutes': row['total_ms'] / 1000 / 60,
+        'real_minutes': (row['last_session'] - row['first_session']) / 1000 / 60
+                        if row['first_session'] and row['last_session'] else 0,
+        'sessions': row['sessions']
+    } for row in rows])
 
 
 @app.route('/api/top-files')
+@ttl_cache()
 def api_top_files():
     """Get top watched files"""
     limit = int(request.args.get('limit', 20))
 
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT
-            fs.id,
-            fs.file_path,
-            fs.total_watch_ms,
-            fs.play_count,
-            fs.last_watched_at,
-            fs.duration_ms,
-            fs.is_image,
-            fs.last_position_ms,
-            COALESCE(skip_cnt.cnt, 0) as skip_count,
-            COALESCE(loop_cnt.cnt, 0) as loop_count
-        FROM file_stats fs
-        LEFT JOIN (SELECT file_id, COUNT(*) as cnt FROM skip_events GROUP BY file_id) skip_cnt ON fs.id = skip_cnt.file_id
-        LEFT JOIN (SELECT file_id, COUNT(*) as cnt FROM loop_events GROUP BY file_id) loop_cnt ON fs.id = loop_cnt.file_id
-        WHERE fs.total_watch_ms > 0
-        ORDER BY fs.total_watch_ms DESC
-        LIMIT ?
-    """, (limit,))
-
-    files = []
-    for row in cur.fetchall():
-        duration_ms = row['duration_ms'] or 0
-        last_pos_ms = row['last_position_ms'] or 0
-        avg_pct = (last_pos_ms * 100.0 / duration_ms) if duration_ms > 0 else 0
-
-        files.append({
-            'file': os.path.basename(row['file_path']),
-            'path': row['file_path'],
-            'watch_time': format_duration(row['total_watch_ms']),
-            'watch_ms': row['total_watch_ms'],
-            'play_count': row['play_count'],
-            'skip_count': row['skip_count'],
-            'loop_count': row['loop_count'],
-            'avg_watch_pct': round(avg_pct, 0),
-            'last_watched': datetime.fromtimestamp(row['last_watched_at'] / 1000).strftime('%Y-%m-%d %H:%M') if row['last_watched_at'] else 'Never',
-            'duration': format_duration(row['duration_ms']),
-            'is_image': bool(row['is_image'])
-        })
-
-    conn.close()
-    return jsonify(files)
+    with get_db() as conn:
+        cur = conn.cursor()
+        # Plain tuples for the hot row loop - skips sqlite3.Row's
+        # name-to-index hashing on every field access.
+        cur.row_factory = None
+
+        cur.execute(_Q_TOP_FILES, (limit,))
+
+        rows = cur.fetchall()
+
+    return jsonify([{
+        'file': _basename(path),
+        'path': path,
+        'watch_time': watch_fmt,
+        'watch_ms': watch_ms,
+        'play_count': play_count,
+        'skip_count': skip_count,
+        'loop_count': loop_count,
+        'avg_watch_pct': avg_pct,
+        'last_watched': last_watched_fmt,
+        'duration': duration_fmt,
+        'is_image': bool(is_image)
+    } for path, watch_ms, watch_fmt, play_count, last_watched_fmt,
+          duration_fmt, is_image, avg_pct, skip_count, loop_count in rows])
 
 
 @app.route('/api/recent-sessions')
+@ttl_cache()
 def api_recent_sessions():
     """Get recent watch sessions"""
     limit = int(request.args.get('limit', 50))
 
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT
-            fs.file_path,
-            ws.started_at,
-            ws.ended_at,
-            ws.duration_ms,
-            ws.cell_row,
-            ws.cell_col,
-            ws.hour_of_day
-        FROM watch_sessions ws
-        JOIN file_stats fs ON ws.file_id = fs.id
-        ORDER BY ws.started_at DESC
-        LIMIT ?
-    """, (limit,))
-
-    sessions = []
-    for row in cur.fetchall():
-        sessions.append({
-            'file': os.path.basename(row['file_path']),
-            'path': row['file_path'],
-            'started': datetime.fromtimestamp(row['started_at'] / 1000).strftime('%Y-%m-%d %H:%M:%S') if row['started_at'] else 'N/A',
-            'ended': datetime.fromtimestamp(row['ended_at'] / 1000).strftime('%H:%M:%S') if row['ended_at'] else 'N/A',
-            'duration': format_duration(row['duration_ms']),
-            'cell': f"[{row['cell_row']},{row['cell_col']}]",
-            'hour': row['hour_of_day']
-        })
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.row_factory = None
 
-    conn.close()
-    return jsonify(sessions)
+        cur.execute(_Q_RECENT_SESSIONS, (limit,))
+
+        rows = cur.fetchall()
+
+    return jsonify([{
+        'file': _basename(path),
+        'path': path,
+        'started': started_fmt,
+        'ended': ended_fmt,
+        'duration': duration_fmt,
+        'cell': f"[{cell_row},{cell_col}]",
+        'hour': hour_of_day
+    } for path, started_fmt, ended_fmt, duration_fmt,
+          cell_row, cell_col, hour_of_day in rows])
 
 
 @app.route('/api/directories')
+@ttl_cache()
 def api_directories():
     """Get directory statistics"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT
-            file_path,
-            total_watch_ms,
-            play_count
-        FROM file_stats
-        WHERE total_watch_ms > 0
-    """)
+    with get_db() as conn:
+        cur = conn.cursor()
 
-    dir_stats = {}
-    for row in cur.fetchall():
-        dir_path = os.path.dirname(row['file_path'])
-        if dir_path not in dir_stats:
-            dir_stats[dir_path] = {'watch_ms': 0, 'play_count': 0, 'file_count': 0}
-        dir_stats[dir_path]['watch_ms'] += row['total_watch_ms']
-        dir_stats[dir_path]['play_count'] += row['play_count']
-        dir_stats[dir_path]['file_count'] += 1
+        # Group inside sqlite via the registered dirname() function - only
+        # the top 20 aggregated rows cross back into Python.
+        cur.execute(_Q_DIRECTORIES)
 
-    # Sort by watch time
-    sorted_dirs = sorted(dir_stats.items(), key=lambda x: x[1]['watch_ms'], reverse=True)[:20]
-
-    conn.close()
+        rows = cur.fetchall()
 
     return jsonify([{
-        'directory': d[0],
-        'short_name': os.path.basename(d[0]) or d[0],
-        'watch_time': format_duration(d[1]['watch_ms']),
-        'watch_ms': d[1]['watch_ms'],
-        'play_count': d[1]['play_count'],
-        'file_count': d[1]['file_count']
-    } for d in sorted_dirs])
+        'directory': row['dir_path'],
+        'short_name': _basename(row['dir_path']) or row['dir_path'],
+        'watch_time': format_duration(row['watch_ms']),
+        'watch_ms': row['watch_ms'],
+        'play_count': row['play_count'],
+        'file_count': row['file_count']
+    } for row in rows])
 
 
 @app.route('/api/events')
+@ttl_cache()
 def api_events():
     """Get recent events (skips, loops, pauses, etc.)"""
     limit = int(request.args.get('limit', 100))
     event_type = request.args.get('type', 'all')
 
-    conn = get_db()
-    cur = conn.cursor()
-
-    events = []
-
-    if event_type in ('all', 'skip'):
-        cur.execute("""
-            SELECT 'skip' as type, file_path, timestamp, skip_type as detail
-            FROM skip_events
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
-        for row in cur.fetchall():
-            events.append({
-                'type': 'skip',
-                'file': os.path.basename(row['file_path']),
-                'time': datetime.fromtimestamp(row['timestamp'] / 1000).strftime('%Y-%m-%d %H:%M:%S'),
-                'timestamp': row['timestamp'],
-                'detail': row['detail']
-            })
-
-    if event_type in ('all', 'loop'):
-        cur.execute("""
-            SELECT 'loop' as type, file_path, timestamp, loop_enabled
-            FROM loop_events
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
-        for row in cur.fetchall():
-            events.append({
-                'type': 'loop',
-                'file': os.path.basename(row['file_path']),
-                'time': datetime.fromtimestamp(row['timestamp'] / 1000).strftime('%Y-%m-%d %H:%M:%S'),
-                'timestamp': row['timestamp'],
-                'detail': 'enabled' if row['loop_enabled'] else 'disabled'
-            })
+    sql = _EVENT_SQL.get(event_type)
+    if sql is None:
+        return jsonify([])
 
-    if event_type in ('all', 'fullscreen'):
-        cur.execute("""
-            SELECT timestamp, is_fullscreen, is_tile, cell_row, cell_col
-            FROM fullscreen_events
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
-        for row in cur.fetchall():
-            detail = 'enter' if row['is_fullscreen'] else 'exit'
-            if row['is_tile']:
-                detail += f" tile [{row['cell_row']},{row['cell_col']}]"
-            events.append({
-                'type': 'fullscreen',
-                'file': '-',
-                'time': datetime.fromtimestamp(row['timestamp'] / 1000).strftime('%Y-%m-%d %H:%M:%S'),
-                'timestamp': row['timestamp'],
-                'detail': detail
-            })
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.row_factory = None
+        cur.execute(sql, {'limit': limit})
 
-    # Sort all events by timestamp
-    events.sort(key=lambda x: x['timestamp'], reverse=True)
+        rows = cur.fetchall()
 
-    conn.close()
-    return jsonify(events[:limit])
+    return jsonify([{
+        'type': etype,
+        'file': _basename(file_path) if file_path else '-',
+        'time': time_fmt,
+        'timestamp': timestamp,
+        'detail': detail
+    } for etype, file_path, timestamp, detail, time_fmt in rows])
 
 
 @app.route('/api/grid-sessions')
+@ttl_cache()
 def api_grid_sessions():
     """Get grid start/stop sessions"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT timestamp, rows, cols, source_path, filter, is_start
-        FROM grid_events
-        ORDER BY timestamp DESC
-        LIMIT 50
-    """)
+    with get_db() as conn:
+        cur = conn.cursor()
+
+        cur.execute(_Q_GRID_SESSIONS)
 
-    sessions = []
-    for row in cur.fetchall():
-        sessions.append({
-            'time': datetime.fromtimestamp(row['timestamp'] / 1000).strftime('%Y-%m-%d %H:%M:%S'),
-            'action': 'Started' if row['is_start'] else 'Stopped',
-            'grid': f"{row['cols']}x{row['rows']}",
-            'source': os.path.basename(row['source_path']) if row['source_path'] else '-',
-            'filter': row['filter'] or '-'
-        })
+        rows = cur.fetchall()
 
-    conn.close()
-    return jsonify(sessions)
+    return jsonify([{
+        'time': row['time_fmt'],
+        'action': 'Started' if row['is_start'] else 'Stopped',
+        'grid': f"{row['cols']}x{row['rows']}",
+        'source': _basename(row['source_path']) if row['source_path'] else '-',
+        'filter': row['filter'] or '-'
+    } for row in rows])
 
 
 @app.route('/api/completion-stats')
+@ttl_cache()
 def api_completion_stats():
     """Get completion rate statistics"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    # Files watched >90%
-    cur.execute("""
-        SELECT COUNT(*) FROM file_stats
-        WHERE duration_ms > 0
-        AND (last_position_ms * 100.0 / duration_ms) >= 90
-    """)
-    full_watch = cur.fetchone()[0]
-
-    # Files watched 10-90%
-    cur.execute("""
-        SELECT COUNT(*) FROM file_stats
-        WHERE duration_ms > 0
-        AND (last_position_ms * 100.0 / duration_ms) >= 10
-        AND (last_position_ms * 100.0 / duration_ms) < 90
-    """)
-    partial_watch = cur.fetchone()[0]
+    with get_db() as conn:
+        cur = conn.cursor()
 
-    # Files watched <10%
-    cur.execute("""
-        SELECT COUNT(*) FROM file_stats
-        WHERE duration_ms > 0
-        AND (last_position_ms * 100.0 / duration_ms) < 10
-    """)
-    skipped = cur.fetchone()[0]
+        # Files watched >90%
+        cur.execute("""
+            SELECT COUNT(*) FROM file_stats
+            WHERE duration_ms > 0
+            AND (last_position_ms * 100.0 / duration_ms) >= 90
+        """)
+        full_watch = cur.fetchone()[0]
 
-    # Average completion rate
-    cur.execute("""
-        SELECT AVG(CASE WHEN duration_ms > 0 THEN (last_position_ms * 100.0 / duration_ms) ELSE 0 END)
-        FROM file_stats WHERE duration_ms > 0
-    """)
-    avg_completion = cur.fetchone()[0] or 0
+        # Files watched 10-90%
+        cur.execute("""
+            SELECT COUNT(*) FROM file_stats
+            WHERE duration_ms > 0
+            AND (last_position_ms * 100.0 / duration_ms) >= 10
+            AND (last_position_ms * 100.0 / duration_ms) < 90
+        """)
+        partial_watch = cur.fetchone()[0]
+
+        # Files watched <10%
+        cur.execute("""
+            SELECT COUNT(*) FROM file_stats
+            WHERE duration_ms > 0
+            AND (last_position_ms * 100.0 / duration_ms) < 10
+        """)
+        skipped = cur.fetchone()[0]
 
-    conn.close()
+        # Average completion rate
+        cur.execute("""
+            SELECT AVG(CASE WHEN duration_ms > 0 THEN (last_position_ms * 100.0 / duration_ms) ELSE 0 END)
+            FROM file_stats WHERE duration_ms > 0
+        """)
+        avg_completion = cur.fetchone()[0] or 0
 
     return jsonify({
         'full_watch_count': full_watch,
@@ -537,108 +941,75 @@ def api_completion_stats():
 
 
 @app.route('/api/skip-heatmap')
+@ttl_cache()
 def api_skip_heatmap():
     """Get skip position heatmap - where users skip most often"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    # Get skip positions as percentage of file duration
-    cur.execute("""
-        SELECT
-            CAST(se.from_position_ms * 100.0 / fs.duration_ms AS INTEGER) / 10 * 10 as bucket,
-            COUNT(*) as cnt
-        FROM skip_events se
-        JOIN file_stats fs ON se.file_id = fs.id
-        WHERE fs.duration_ms > 0
-        GROUP BY bucket
-        ORDER BY bucket
-    """)
+    with get_db() as conn:
+        cur = conn.cursor()
 
-    # Initialize all buckets
-    heatmap = {i: 0 for i in range(0, 110, 10)}
-    for row in cur.fetchall():
-        bucket = min(100, max(0, row['bucket']))
-        heatmap[bucket] = row['cnt']
+        # Get skip positions as percentage of file duration
+        cur.execute(_Q_SKIP_HEATMAP)
 
-    conn.close()
+        # Aligned 11-slot array, same pattern as hourly/daily.
+        values = [0] * 11
+        for row in cur:
+            bucket = min(100, max(0, row['bucket']))
+            values[bucket // 10] = row['cnt']
 
     return jsonify({
-        'labels': [f"{i}%" for i in range(0, 110, 10)],
-        'values': [heatmap[i] for i in range(0, 110, 10)]
+        'labels': PCT10_LABELS,
+        'values': values
     })
 
 
 @app.route('/api/position-heatmap')
+@ttl_cache()
 def api_position_heatmap():
     """Get position viewing heatmap - which parts are watched most"""
-    conn = get_db()
-    cur = conn.cursor()
+    with get_db() as conn:
+        cur = conn.cursor()
 
-    # Check if position_samples table exists
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='position_samples'")
-    if not cur.fetchone():
-        conn.close()
-        return jsonify({'labels': [], 'values': []})
-
-    cur.execute("""
-        SELECT position_pct, COUNT(*) as cnt
-        FROM position_samples
-        GROUP BY position_pct
-        ORDER BY position_pct
-    """)
+        # Check if position_samples table exists
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='position_samples'")
+        if not cur.fetchone():
+            return jsonify({'labels': [], 'values': []})
 
-    heatmap = {i: 0 for i in range(0, 105, 5)}
-    for row in cur.fetchall():
-        heatmap[row['position_pct']] = row['cnt']
+        cur.execute(_Q_POSITION_HEATMAP)
 
-    conn.close()
+        # Aligned 21-slot array; samples land on 5% boundaries.
+        values = [0] * 21
+        for row in cur:
+            pct = min(100, max(0, row['position_pct']))
+            values[pct // 5] += row['cnt']
 
     return jsonify({
-        'labels': [f"{i}%" for i in range(0, 105, 5)],
-        'values': [heatmap[i] for i in range(0, 105, 5)]
+        'labels': PCT5_LABELS,
+        'values': values
     })
 
 
 @app.route('/api/session-distribution')
+@ttl_cache()
 def api_session_distribution():
     """Get session length distribution"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("SELECT duration_ms FROM watch_sessions WHERE duration_ms > 0")
-
-    # Buckets: <30s, 30s-1m, 1-2m, 2-5m, 5-10m, 10-30m, 30m-1h, >1h
-    buckets = {
-        '<30s': 0,
-        '30s-1m': 0,
-        '1-2m': 0,
-        '2-5m': 0,
-        '5-10m': 0,
-        '10-30m': 0,
-        '30m-1h': 0,
-        '>1h': 0
-    }
-
-    for row in cur.fetchall():
-        duration_sec = row['duration_ms'] / 1000
-        if duration_sec < 30:
-            buckets['<30s'] += 1
-        elif duration_sec < 60:
-            buckets['30s-1m'] += 1
-        elif duration_sec < 120:
-            buckets['1-2m'] += 1
-        elif duration_sec < 300:
-            buckets['2-5m'] += 1
-        elif duration_sec < 600:
-            buckets['5-10m'] += 1
-        elif duration_sec < 1800:
-            buckets['10-30m'] += 1
-        elif duration_sec < 3600:
-            buckets['30m-1h'] += 1
-        else:
-            buckets['>1h'] += 1
-
-    conn.close()
+    with get_db() as conn:
+        cur = conn.cursor()
+
+        # Bucketing happens in the CASE expression, so only the 8 bucket
+        # counts cross the boundary; the dict just fixes display order.
+        buckets = {
+            '<30s': 0,
+            '30s-1m': 0,
+            '1-2m': 0,
+            '2-5m': 0,
+            '5-10m': 0,
+            '10-30m': 0,
+            '30m-1h': 0,
+            '>1h': 0
+        }
+        cur.execute(_Q_SESSION_DIST)
+        for row in cur:
+            buckets[row['bucket']] = row['n']
 
     return jsonify({
         'labels': list(buckets.keys()),
@@ -647,31 +1018,26 @@ def api_session_distribution():
 
 
 @app.route('/api/file-type-breakdown')
+@ttl_cache()
 def api_file_type_breakdown():
     """Get video vs image time breakdown"""
-    conn = get_db()
-    cur = conn.cursor()
+    with get_db() as conn:
+        cur = conn.cursor()
 
-    cur.execute("""
-        SELECT is_image, SUM(total_watch_ms) as total, COUNT(*) as count
-        FROM file_stats
-        GROUP BY is_image
-    """)
+        cur.execute(_Q_FILE_TYPES)
 
-    video_ms = 0
-    image_ms = 0
-    video_count = 0
-    image_count = 0
+        video_ms = 0
+        image_ms = 0
+        video_count = 0
+        image_count = 0
 
-    for row in cur.fetchall():
-        if row['is_image']:
-            image_ms = row['total'] or 0
-            image_count = row['count']
-        else:
-            video_ms = row['total'] or 0
-            video_count = row['count']
-
-    conn.close()
+        for row in cur:
+            if row['is_image']:
+                image_ms = row['total'] or 0
+                image_count = row['count']
+            else:
+                video_ms = row['total'] or 0
+                video_count = row['count']
 
     return jsonify({
         'video_time': format_duration(video_ms),
@@ -684,61 +1050,41 @@ def api_file_type_breakdown():
 
 
 @app.route('/api/skip-types')
+@ttl_cache()
 def api_skip_types():
     """Get skip type breakdown"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT skip_type, COUNT(*) as cnt
-        FROM skip_events
-        GROUP BY skip_type
-        ORDER BY cnt DESC
-    """)
+    with get_db() as conn:
+        cur = conn.cursor()
 
-    types = {}
-    for row in cur.fetchall():
-        types[row['skip_type'] or 'unknown'] = row['cnt']
+        cur.execute(_Q_SKIP_TYPES)
 
-    conn.close()
+        types = {}
+        for row in cur:
+            types[row['skip_type'] or 'unknown'] = row['cnt']
 
     return jsonify(types)
 
 
 @app.route('/api/concurrent-stats')
+@ttl_cache()
 def api_concurrent_stats():
     """Get concurrent cell statistics"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    # Average concurrent cells (estimated from parallelism factor)
-    cur.execute("""
-        SELECT
-            COALESCE(SUM(duration_ms), 0) as total,
-            (MAX(ended_at) - MIN(started_at)) as elapsed
-        FROM watch_sessions
-        WHERE started_at > 0
-    """)
-    row = cur.fetchone()
-    avg_concurrent = (row['total'] / row['elapsed']) if row and row['elapsed'] else 1.0
-
-    # Get cell usage distribution
-    cur.execute("""
-        SELECT cell_row, cell_col, COUNT(*) as sessions, SUM(duration_ms) as total_ms
-        FROM watch_sessions
-        GROUP BY cell_row, cell_col
-        ORDER BY total_ms DESC
-    """)
+    with get_db() as conn:
+        cur = conn.cursor()
+
+        # Average concurrent cells (estimated from parallelism factor)
+        cur.execute(_Q_CONCURRENT_SPAN)
+        row = cur.fetchone()
+        avg_concurrent = (row['total'] / row['elapsed']) if row and row['elapsed'] else 1.0
+
+        # Get cell usage distribution
+        cur.execute(_Q_CELL_USAGE)
 
-    cells = []
-    for row in cur.fetchall():
-        cells.append({
+        cells = [{
             'cell': f"[{row['cell_row']},{row['cell_col']}]",
             'sessions': row['sessions'],
-            'watch_time': format_duration(row['total_ms'])
-        })
-
-    conn.close()
+            'watch_time': row['watch_fmt']
+        } for row in cur]
 
     return jsonify({
         'average_concurrent': round(avg_concurrent, 2),
@@ -747,98 +1093,69 @@ def api_concurrent_stats():
 
 
 @app.route('/api/weekly-trend')
+@ttl_cache(seconds=60)
 def api_weekly_trend():
     """Get weekly watch time trend"""
+    _start_rollup()
+
     weeks = int(request.args.get('weeks', 12))
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT
-            strftime('%Y-W%W', started_at / 1000, 'unixepoch', 'localtime') as week,
-            SUM(duration_ms) as total
-        FROM watch_sessions
-        WHERE started_at >= ?
-        GROUP BY week
-        ORDER BY week
-    """, (int((datetime.now() - timedelta(weeks=weeks)).timestamp() * 1000),))
-
-    data = []
-    for row in cur.fetchall():
-        data.append({
-            'week': row['week'],
-            'minutes': row['total'] / 1000 / 60
-        })
-
-    conn.close()
-    return jsonify(data)
+    with get_db() as conn:
+        cur = conn.cursor()
+
+        cur.execute(_Q_WEEKLY_TREND, (_now_ms() - weeks * 7 * _MS_PER_DAY,))
+
+        rows = cur.fetchall()
+
+    return jsonify([{
+        'week': row['week'],
+        'minutes': row['total'] / 1000 / 60
+    } for row in rows])
 
 
 @app.route('/api/monthly-trend')
+@ttl_cache(seconds=60)
 def api_monthly_trend():
     """Get monthly watch time trend"""
-    months = int(request.args.get('months', 12))
-    conn = get_db()
-    cur = conn.cursor()
+    _start_rollup()
 
-    # Calculate start date
-    start_date = datetime.now() - timedelta(days=months * 30)
+    months = int(request.args.get('months', 12))
+    with get_db() as conn:
+        cur = conn.cursor()
 
-    cur.execute("""
-        SELECT
-            strftime('%Y-%m', started_at / 1000, 'unixepoch', 'localtime') as month,
-            SUM(duration_ms) as total
-        FROM watch_sessions
-        WHERE started_at >= ?
-        GROUP BY month
-        ORDER BY month
-    """, (int(start_date.timestamp() * 1000),))
+        cur.execute(_Q_MONTHLY_TREND, (_now_ms() - months * 30 * _MS_PER_DAY,))
 
-    data = []
-    for row in cur.fetchall():
-        data.append({
-            'month': row['month'],
-            'minutes': row['total'] / 1000 / 60
-        })
+        rows = cur.fetchall()
 
-    conn.close()
-    return jsonify(data)
+    return jsonify([{
+        'month': row['month'],
+        'minutes': row['total'] / 1000 / 60
+    } for row in rows])
 
 
 @app.route('/api/favorites')
 def api_favorites():
     """Get favorite files"""
-    conn = get_db()
-    cur = conn.cursor()
+    with get_db() as conn:
+        cur = conn.cursor()
 
-    # Check if favorites table exists
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='favorites'")
-    if not cur.fetchone():
-        conn.close()
-        return jsonify([])
+        # Check if favorites table exists
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='favorites'")
+        if not cur.fetchone():
+            return jsonify([])
 
-    cur.execute("""
-        SELECT fs.file_path, fs.total_watch_ms, fs.play_count, fs.last_watched_at,
-               fs.is_image, f.added_at
-        FROM favorites f
-        JOIN file_stats fs ON f.file_id = fs.id
-        ORDER BY f.added_at DESC
-    """)
+        cur.execute(_Q_FAVORITES)
 
-    favorites = []
-    for row in cur.fetchall():
-        favorites.append({
-            'file': os.path.basename(row['file_path']),
-            'path': row['file_path'],
-            'watch_time': format_duration(row['total_watch_ms']),
-            'play_count': row['play_count'],
-            'is_image': bool(row['is_image']),
-            'last_watched': datetime.fromtimestamp(row['last_watched_at'] / 1000).strftime('%Y-%m-%d %H:%M') if row['last_watched_at'] else 'Never',
-            'added_at': datetime.fromtimestamp(row['added_at'] / 1000).strftime('%Y-%m-%d %H:%M') if row['added_at'] else 'Unknown'
-        })
+        rows = cur.fetchall()
 
-    conn.close()
-    return jsonify(favorites)
+    return jsonify([{
+        'file': _basename(row['file_path']),
+        'path': row['file_path'],
+        'watch_time': row['watch_fmt'],
+        'play_count': row['play_count'],
+        'is_image': bool(row['is_image']),
+        'last_watched': row['last_watched_fmt'],
+        'added_at': row['added_fmt']
+    } for row in rows])
 
 
 @app.route('/api/toggle-favorite', methods=['POST'])
@@ -850,100 +1167,65 @@ def api_toggle_favorite():
     if not file_path:
         return jsonify({'error': 'No path provided'}), 400
 
-    conn = get_db()
-    cur = conn.cursor()
+    with get_db() as conn:
+        cur = conn.cursor()
 
-    # Check if favorites table exists, create if not
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS favorites (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            file_id INTEGER UNIQUE NOT NULL,
-            added_at INTEGER DEFAULT (strftime('%s', 'now') * 1000),
-            FOREIGN KEY (file_id) REFERENCES file_stats(id)
-        )
-    """)
+        # Get file_id (the favorites table itself is ensured at connect time)
+        cur.execute("SELECT id FROM file_stats WHERE file_path = ?", (file_path,))
+        row = cur.fetchone()
+        if not row:
+            return jsonify({'error': 'File not found'}), 404
 
-    # Get file_id
-    cur.execute("SELECT id FROM file_stats WHERE file_path = ?", (file_path,))
-    row = cur.fetchone()
-    if not row:
-        conn.close()
-        return jsonify({'error': 'File not found'}), 404
+        file_id = row['id']
 
-    file_id = row['id']
+        # Try the delete first; RETURNING tells us whether it was a favorite
+        # without a separate existence check.
+        cur.execute("DELETE FROM favorites WHERE file_id = ? RETURNING id",
+                    (file_id,))
+        if cur.fetchone():
+            is_favorite = False
+        else:
+            cur.execute("INSERT INTO favorites (file_id) VALUES (?)", (file_id,))
+            is_favorite = True
 
-    # Check if already favorite
-    cur.execute("SELECT id FROM favorites WHERE file_id = ?", (file_id,))
-    if cur.fetchone():
-        # Remove from favorites
-        cur.execute("DELETE FROM favorites WHERE file_id = ?", (file_id,))
-        is_favorite = False
-    else:
-        # Add to favorites
-        cur.execute("INSERT INTO favorites (file_id) VALUES (?)", (file_id,))
-        is_favorite = True
+        conn.commit()
 
-    conn.commit()
-    conn.close()
-
-    return jsonify({'is_favorite': is_favorite})
+        return jsonify({'is_favorite': is_favorite})
 
 
 @app.route('/api/directory-analysis')
+@ttl_cache(seconds=60)
 def api_directory_analysis():
     """Get enhanced directory statistics with session analysis"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    # Get all files grouped by directory
-    cur.execute("""
-        SELECT file_path, total_watch_ms, play_count
-        FROM file_stats
-        WHERE total_watch_ms > 0
-    """)
-
-    dir_stats = {}
-    for row in cur.fetchall():
-        dir_path = os.path.dirname(row['file_path'])
-        if dir_path not in dir_stats:
-            dir_stats[dir_path] = {
-                'watch_ms': 0,
-                'play_count': 0,
-                'file_count': 0,
-                'session_count': 0
-            }
-        dir_stats[dir_path]['watch_ms'] += row['total_watch_ms']
-        dir_stats[dir_path]['play_count'] += row['play_count']
-        dir_stats[dir_path]['file_count'] += 1
-
-    # Get session counts per directory
-    cur.execute("""
-        SELECT fs.file_path, COUNT(*) as sessions
-        FROM watch_sessions ws
-        JOIN file_stats fs ON ws.file_id = fs.id
-        GROUP BY fs.file_path
-    """)
-
-    for row in cur.fetchall():
-        dir_path = os.path.dirname(row['file_path'])
-        if dir_path in dir_stats:
-            dir_stats[dir_path]['session_count'] += row['sessions']
-
-    # Sort and format
-    sorted_dirs = sorted(dir_stats.items(), key=lambda x: x[1]['watch_ms'], reverse=True)[:20]
-
-    conn.close()
+    with get_db() as conn:
+        cur = conn.cursor()
+        # Both the per-file aggregation and the session-count join group on
+        # the registered dirname() function, so only 20 rows come back.
+        cur.execute(_Q_DIR_ANALYSIS)
+        rows = cur.fetchall()
 
     return jsonify([{
-        'directory': d[0],
-        'short_name': os.path.basename(d[0]) or d[0],
-        'watch_time': format_duration(d[1]['watch_ms']),
-        'watch_ms': d[1]['watch_ms'],
-        'play_count': d[1]['play_count'],
-        'file_count': d[1]['file_count'],
-        'session_count': d[1]['session_count'],
-        'avg_session_per_file': round(d[1]['session_count'] / d[1]['file_count'], 1) if d[1]['file_count'] > 0 else 0
-    } for d in sorted_dirs])
+        'directory': row['dir_path'],
+        'short_name': _basename(row['dir_path']) or row['dir_path'],
+        'watch_time': format_duration(row['watch_ms']),
+        'watch_ms': row['watch_ms'],
+        'play_count': row['play_count'],
+        'file_count': row['file_count'],
+        'session_count': row['session_count'],
+        'avg_session_per_file': round(row['session_count'] / row['file_count'], 1) if row['file_count'] > 0 else 0
+    } for row in rows])
+
+
+def _reap_mpv():
+    """Collect exited mpv children so they don't linger as zombies"""
+    with _mpv_lock:
+        for pid in _mpv_pids[:]:
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                _mpv_pids.remove(pid)
 
 
 @app.route('/api/open-mpv', methods=['POST'])
@@ -955,12 +1237,22 @@ def api_open_mpv():
     if not path:
         return jsonify({'error': 'No path provided'}), 400
 
-    if not os.path.exists(path):
+    # Resolve symlinks/.. before handing the path to mpv.
+    path = os.path.realpath(path)
+    if not os.path.isfile(path):
         return jsonify({'error': 'File not found'}), 404
 
+    if MPV_PATH is None:
+        return jsonify({'error': 'mpv not found in PATH'}), 500
+
     try:
-        subprocess.Popen(['mpv', path])
-        return jsonify({'success': True, 'file': os.path.basename(path)})
+        # posix_spawn instead of Popen: no fork() of the full interpreter
+        # and no close_fds scan, just a vfork+exec in libc.
+        pid = os.posix_spawn(MPV_PATH, [MPV_PATH, path], dict(os.environ))
+        with _mpv_lock:
+            _mpv_pids.append(pid)
+        _reap_mpv()
+        return jsonify({'success': True, 'file': _basename(path)})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1035,4 +1327,7 @@ if __name__ == '__main__':
     print(f"Goobert Stats Dashboard")
     print(f"Database: {DB_PATH}")
     print(f"Starting server at http://localhost:5000")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Dev fallback - production serving goes through run.sh (gunicorn).
+    # threaded=True lets concurrent requests overlap their SQLite waits
+    # (the GIL releases inside sqlite3's C calls).
+    app.run(debug=False, host='0.0.0.0', port=5000, threaded=True)
@@ -21,4 +21,6 @@ echo ""
 echo "Open in browser: http://localhost:5000"
 echo ""
 
-python app.py
+# gthread workers suit the SQLite-IO-bound handlers; --preload forks after
+# import so the SQL constants and statement caches are shared copy-on-write.
+exec gunicorn -w 2 -k gthread --threads 8 --preload -b 0.0.0.0:5000 app:app
@@ -15,7 +15,7 @@ QStringList FileScanner::scan(const QString &path) const
     }
 
     if (fi.isFile()) {
-        if (QString ext = fi.suffix().toLower(); s_videoExts.contains(ext) || s_imageExts.contains(ext)) {
+        if (QString ext = fi.suffix().toLower(); s_mediaExts.contains(ext)) {
             result.append(fi.absoluteFilePath());
         }
         return result;
@@ -24,7 +24,14 @@ QStringList FileScanner::scan(const QString &path) const
     QDirIterator it(path, QDir::Files, QDirIterator::Subdirectories);
     while (it.hasNext()) {
         it.next();
-        if (QString ext = it.fileInfo().suffix().toLower(); s_videoExts.contains(ext) || s_imageExts.contains(ext)) {
+        // Take the suffix from the entry name directly - fileInfo() would
+        // construct a QFileInfo (and potentially stat) per file.
+        const QString name = it.fileName();
+        const qsizetype dot = name.lastIndexOf(u'.');
+        if (dot < 0) {
+            continue;
+        }
+        if (QString ext = name.mid(dot + 1).toLower(); s_mediaExts.contains(ext)) {
             result.append(it.filePath());
         }
     }
@@ -53,7 +60,9 @@ QStringList FileScanner::applyFilter(const QStringList &files, const QString &fi
 
     QStringList result;
     for (const QString &file : files) {
-        const QString filename = QFileInfo(file).fileName().toLower();
+        // Scan results always use '/' separators, so slicing the string is
+        // enough - no QFileInfo allocation per candidate.
+        const QString filename = file.mid(file.lastIndexOf(u'/') + 1).toLower();
 
         // All terms must match (AND) - using std::ranges::all_of
         bool allMatch = std::ranges::all_of(terms, [&filename](const QString &term) {
@@ -24,4 +24,6 @@ private:
     static inline const QSet<QString> s_imageExts = {
         "jpg", "jpeg", "png", "webp", "avif", "bmp", "tif", "tiff", "gif"
     };
+    // Union of the two, so scanning does one hash lookup per file.
+    static inline const QSet<QString> s_mediaExts = s_videoExts | s_imageExts;
 };
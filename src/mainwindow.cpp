@@ -547,21 +547,19 @@ void MainWindow::exitTileFullscreen()
         m_fullscreenCell->setOsdLevel(0);
     }
 
-    // Restore all cells
-    for (GridCell *c : m_cells) {
-        m_gridLayout->removeWidget(c);
+    // Only the fullscreen cell changed its layout slot on entry; the others
+    // were merely hidden, so put the one cell back and re-show the rest
+    // instead of tearing down and rebuilding the whole grid layout.
+    if (m_fullscreenCell) {
+        m_gridLayout->removeWidget(m_fullscreenCell);
+        m_gridLayout->addWidget(m_fullscreenCell,
+                                m_fullscreenCell->row(), m_fullscreenCell->col());
     }
 
-    for (int r = 0; r < m_rows; ++r) {
-        for (int c = 0; c < m_cols; ++c) {
-            GridCell *cell = m_cellMap.value({r, c});
-            if (cell) {
-                m_gridLayout->addWidget(cell, r, c);
-                cell->show();
-                cell->unmute();
-                cell->play();
-            }
-        }
+    for (GridCell *c : m_cells) {
+        c->show();
+        c->unmute();
+        c->play();
     }
 
     m_isTileFullscreen = false;
@@ -653,9 +651,19 @@ void MainWindow::muteAll()
 void MainWindow::setVolumeAll(int volume)
 {
     m_currentVolume = volume;
-    for (GridCell *cell : m_cells) {
-        cell->setVolume(volume);
+
+    // The toolbar slider fires per pixel of drag; trailing-edge debounce so
+    // only the final value within the window reaches the cells.
+    if (!m_volumeDebounce) {
+        m_volumeDebounce = new QTimer(this);
+        m_volumeDebounce->setSingleShot(true);
+        connect(m_volumeDebounce, &QTimer::timeout, this, [this]() {
+            for (GridCell *cell : m_cells) {
+                cell->setVolume(m_currentVolume);
+            }
+        });
     }
+    m_volumeDebounce->start(MainWindowConstants::kVolumeDebounceMs);
 }
 
 void MainWindow::volumeUpAll()
@@ -28,6 +28,7 @@ namespace MainWindowConstants {
     inline constexpr int kWatchdogIntervalMs = 5000;
     inline constexpr int kShuffleNextDelayMs = 200;
     inline constexpr int kVolumeStep = 5;
+    inline constexpr int kVolumeDebounceMs = 50;
     inline constexpr double kSeekStepSeconds = 5.0;
     inline constexpr double kSeekStepLongSeconds = 120.0;
 }
@@ -127,6 +128,7 @@ private:
 
     // Watchdog for auto-restart
     QTimer *m_watchdogTimer = nullptr;
+    QTimer *m_volumeDebounce = nullptr;
     QMap<QPair<int,int>, QStringList> m_cellPlaylists;
     QString m_currentFilter;
 
@@ -47,23 +47,21 @@ void MonitorWidget::setupUi()
 
 void MonitorWidget::updateCellStatus(int row, int col, const QString &path, double pos, double dur, bool paused)
 {
-    QString cellId = QString("%1,%2").arg(row).arg(col);
-
-    // Find or create row
-    int tableRow = -1;
-    for (int i = 0; i < m_table->rowCount(); ++i) {
-        if (m_table->item(i, 0) && m_table->item(i, 0)->text() == cellId) {
-            tableRow = i;
-            break;
-        }
-    }
+    // Find or create row - the map avoids scanning the table's id column
+    // on every position tick.
+    int tableRow = m_rowByCell.value({row, col}, -1);
 
     if (tableRow < 0) {
         tableRow = m_table->rowCount();
         m_table->insertRow(tableRow);
-        m_table->setItem(tableRow, 0, new QTableWidgetItem(cellId));
+        auto *idItem = new QTableWidgetItem(QString("%1,%2").arg(row).arg(col));
+        // Keep the coordinates as data so handlers don't re-parse the text.
+        idItem->setData(Qt::UserRole, row);
+        idItem->setData(Qt::UserRole + 1, col);
+        m_table->setItem(tableRow, 0, idItem);
         m_table->setItem(tableRow, 1, new QTableWidgetItem());
         m_table->setItem(tableRow, 2, new QTableWidgetItem());
+        m_rowByCell.insert({row, col}, tableRow);
     }
 
     // Status with play/pause indicator
@@ -73,18 +71,28 @@ void MonitorWidget::updateCellStatus(int row, int col, const QString &path, doub
         .arg(formatTime(pos))
         .arg(formatTime(dur));
 
-    QFileInfo fi(path);
-    m_table->item(tableRow, 1)->setText(status);
+    // Paused or idle cells report the same status every tick; skipping the
+    // write avoids a dataChanged/repaint for rows that look identical.
+    QTableWidgetItem *statusItem = m_table->item(tableRow, 1);
+    if (statusItem->text() != status) {
+        statusItem->setText(status);
+    }
 
+    // The file column only changes when the cell advances to a new file;
+    // position ticks arrive at ~4Hz per cell, so skip the basename split
+    // and the three item updates when the path is unchanged.
     QTableWidgetItem *fileItem = m_table->item(tableRow, 2);
-    fileItem->setText(fi.fileName());
-    fileItem->setData(Qt::UserRole, path);  // Store full path
-    fileItem->setToolTip(path);
+    if (fileItem->data(Qt::UserRole).toString() != path) {
+        fileItem->setText(path.mid(path.lastIndexOf(u'/') + 1));
+        fileItem->setData(Qt::UserRole, path);  // Store full path
+        fileItem->setToolTip(path);
+    }
 }
 
 void MonitorWidget::clear()
 {
     m_table->setRowCount(0);
+    m_rowByCell.clear();
 }
 
 QString MonitorWidget::formatTime(double seconds) const
@@ -110,12 +118,8 @@ void MonitorWidget::onContextMenu(const QPoint &pos)
     QTableWidgetItem *fileItem = m_table->item(row, 2);
     if (!cellItem || !fileItem) return;
 
-    QString cellId = cellItem->text();
-    QStringList parts = cellId.split(",");
-    if (parts.size() != 2) return;
-
-    int cellRow = parts[0].toInt();
-    int cellCol = parts[1].toInt();
+    int cellRow = cellItem->data(Qt::UserRole).toInt();
+    int cellCol = cellItem->data(Qt::UserRole + 1).toInt();
     QString fullPath = fileItem->data(Qt::UserRole).toString();
 
     QMenu menu(this);
@@ -142,11 +146,8 @@ void MonitorWidget::onItemDoubleClicked(QTableWidgetItem *item)
     QTableWidgetItem *cellItem = m_table->item(row, 0);
     if (!cellItem) return;
 
-    QString cellId = cellItem->text();
-    QStringList parts = cellId.split(",");
-    if (parts.size() == 2) {
-        emit cellSelected(parts[0].toInt(), parts[1].toInt());
-    }
+    emit cellSelected(cellItem->data(Qt::UserRole).toInt(),
+                      cellItem->data(Qt::UserRole + 1).toInt());
 }
 
 void MonitorWidget::renameFile(int row, int col, const QString &currentPath)
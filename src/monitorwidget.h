@@ -2,6 +2,8 @@
 
 #include <QWidget>
 #include <QTableWidget>
+#include <QMap>
+#include <QPair>
 
 class MonitorWidget : public QWidget
 {
@@ -29,4 +31,5 @@ private:
     void setCustomSource(int row, int col);
 
     QTableWidget *m_table = nullptr;
+    QMap<QPair<int,int>, int> m_rowByCell;  // (row,col) -> table row
 };